@@ -8,7 +8,9 @@ Format details of ccp4 can be found in http://www.ccp4.ac.uk/html/maplib.html.
 """
 
 import warnings
-import struct
+import io
+import math
+import mmap
 
 import urllib.request
 import numpy as np
@@ -18,9 +20,25 @@ try:
 except ImportError:
     from . import utils
 
+try:
+    from .nutils import createCrsLists
+except ImportError:
+    createCrsLists = utils.createCrsLists
+
 urlPrefix = "http://www.ebi.ac.uk/pdbe/coordinates/files/"
 urlSuffix = ".ccp4"
 
+## Layout of the first 224 bytes of a ccp4 header, up to the labels.
+headerDtype = np.dtype([('ncrs', '3i4'), ('mode', 'i4'), ('crsStart', '3i4'),
+                        ('nintervalX', 'i4'), ('nintervalY', 'i4'), ('nintervalZ', 'i4'),
+                        ('xlength', 'f4'), ('ylength', 'f4'), ('zlength', 'f4'),
+                        ('alpha', 'f4'), ('beta', 'f4'), ('gamma', 'f4'),
+                        ('col2xyz', 'i4'), ('row2xyz', 'i4'), ('sec2xyz', 'i4'),
+                        ('densityMin', 'f4'), ('densityMax', 'f4'), ('densityMean', 'f4'),
+                        ('spaceGroup', 'i4'), ('symmetryBytes', 'i4'), ('skewFlag', 'i4'),
+                        ('skewMat', '9f4'), ('skewTrans', '3f4'), ('futureUse', '12f4'), ('originEM', '3f4'),
+                        ('mapChar', 'S4'), ('machineStamp', 'i4'), ('rmsd', 'f4'), ('nLabel', 'i4')])
+
 
 def readFromPDBID(pdbid, verbose=False):
     """Creates :class:`pdb_eda.ccp4.DensityMatrix` object.
@@ -76,6 +94,7 @@ def read(ccp4Filename, pdbid=None, verbose=False):
 
 def parse(handle, pdbid, verbose=False):
     """Creates :class:`pdb_eda.ccp4.DensityMatrix` object.
+    Handles of regular files are memory-mapped, other handles (e.g. url or gzip streams) are read once into memory.
 
     :param handle: an I/O handle for .ccp4 file.
     :type handle: :class:`io.IOBase`
@@ -87,41 +106,49 @@ def parse(handle, pdbid, verbose=False):
     :return: densityMatrix
     :rtype: :class:`pdb_eda.ccp4.DensityMatrix`
     """
-    header = DensityHeader.fromFileHeader(handle.read(1024))
+    if isinstance(handle, (io.BufferedReader, io.FileIO)) and handle.seekable() and handle.tell() == 0:
+        try:
+            fileBuffer = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError): # e.g. empty or special files cannot be mapped.
+            pass
+        else:
+            with fileBuffer:
+                return parseBuffer(fileBuffer, pdbid, verbose)
+
+    return parseBuffer(handle.read(), pdbid, verbose)
+
+
+def parseBuffer(buffer, pdbid, verbose=False):
+    """Creates :class:`pdb_eda.ccp4.DensityMatrix` object.
+
+    :param buffer: the content of a .ccp4 file.
+    :type buffer: :py:class:`bytes`, :py:class:`mmap.mmap`
+    :param pdbid: PDB entry ID.
+    :type pdbid: :py:class:`str`
+    :param verbose: verbose mode, defaults to :py:obj:`False`
+    :type verbose: :py:class:`bool`
+
+    :return: densityMatrix
+    :rtype: :class:`pdb_eda.ccp4.DensityMatrix`
+    """
+    header = DensityHeader.fromFileHeader(buffer[:1024], verbose)
     endian = header.endian
-    dataBuffer = handle.read()
+    dataLength = len(buffer) - 1024
 
     # Sanity check on file sizes
-    if len(dataBuffer) != header.symmetryBytes + header.mapSize:
-        assert header.symmetryBytes == 0 | len(
-            dataBuffer) != header.mapSize, "Error: File contains suspicious symmetry records"
-        assert header.mapSize == 0 | len(dataBuffer) != header.symmetryBytes, "Error: File contains no map data"
-        assert len(dataBuffer) > header.symmetryBytes + header.mapSize, "Error: contains incomplete data"
-        assert len(dataBuffer) < header.symmetryBytes + header.mapSize, "Error: File contains larger than expected data"
+    if dataLength != header.symmetryBytes + header.mapSize:
+        assert header.symmetryBytes == 0 or dataLength != header.mapSize, "Error: File contains suspicious symmetry records"
+        assert header.mapSize == 0 or dataLength != header.symmetryBytes, "Error: File contains no map data"
+        assert dataLength > header.symmetryBytes + header.mapSize, "Error: contains incomplete data"
+        assert dataLength < header.symmetryBytes + header.mapSize, "Error: File contains larger than expected data"
 
     assert header.xlength != 0.0 or header.ylength != 0.0 or header.zlength != 0.0, "Error: Cell dimensions are all 0, Map file will not align with other structures"
 
-    if header.nintervalX == 0 & header.ncrs[0] > 0:
-        header.nintervalX = header.ncrs[0] - 1
-        if verbose: warnings.warn("Fixed number of X interval")
-    if header.nintervalY == 0 & header.ncrs[1] > 0:
-        header.nintervalY = header.ncrs[1] - 1
-        if verbose: warnings.warn("Fixed number of Y interval")
-    if header.nintervalZ == 0 & header.ncrs[2] > 0:
-        header.nintervalZ = header.ncrs[2] - 1
-        if verbose: warnings.warn("Fixed number of Z interval.")
-
-    if header.col2xyz == 0 & header.row2xyz == 0 & header.sec2xyz == 0:
-        header.col2xyz = 1
-        header.row2xyz = 2
-        header.sec2xyz = 3
-        if verbose: warnings.warn("Mappings from column/row/section to xyz are all 0, set to 1, 2, 3 instead.")
-
-    header.symmetry = dataBuffer[0:header.symmetryBytes]
-    mapData = dataBuffer[header.symmetryBytes:len(dataBuffer)]
-
-    numBytes = int(len(mapData) / 4)
-    densities = struct.unpack(endian + numBytes * 'f', mapData)
+    header.symmetry = bytes(buffer[1024:1024 + header.symmetryBytes])
+
+    # Cast the map bytes in place with the file's byte order, then copy once into a native, writable array,
+    # so no view into the buffer outlives this call.
+    densities = np.frombuffer(buffer, dtype=np.dtype(endian + 'f4'), offset=1024 + header.symmetryBytes).astype(np.float32)
     origin = header.origin
 
     return DensityMatrix(header, origin, densities, pdbid)
@@ -131,11 +158,13 @@ class DensityHeader(object):
     """:class:`pdb_eda.ccp4.DensityHeader` that stores information about ccp4 header."""
 
     @classmethod
-    def fromFileHeader(cls, fileHeader):
+    def fromFileHeader(cls, fileHeader, verbose=False):
         """RETURNS :class:`pdb_eda.ccp4.DensityHeader` object given the fileHeader.
 
         :param fileHeader: ccp4 file header.
         :type fileHeader: :py:class:`bytes`
+        :param verbose: verbose mode, defaults to :py:obj:`False`
+        :type verbose: :py:class:`bool`
 
         :return: densityHeader
         :rtype: :class:`pdb_eda.ccp4.DensityHeader`
@@ -146,31 +175,31 @@ class DensityHeader(object):
         endian = '<' if 0 <= mode <= 6 else '>'
 
         # Header
-        headerFormat = endian + 10 * 'i' + 6 * 'f' + 3 * 'i' + 3 * 'f' + 3 * 'i' + 27 * 'f' + 4 * 'c' + 'ifi'
-        headerTuple = struct.unpack(headerFormat, fileHeader[:224])
-        #print(headerTuple)
-        labels = fileHeader[224:]  # Labels in header
+        headerRecord = np.frombuffer(fileHeader[:224], dtype=headerDtype.newbyteorder(endian))[0]
+        labels = bytes(fileHeader[224:])  # Labels in header
         labels = labels.replace(b' ', b'')
 
-        header = DensityHeader(headerTuple, labels, endian)
+        header = DensityHeader(headerRecord, labels, endian, verbose)
         return header
 
-    def __init__(self, headerTuple, labels, endian):
+    def __init__(self, headerRecord, labels, endian, verbose=False):
         """Initialize the DensityHeader object, assign values to data members accordingly, and calculate some metrics that will be used frequently.
 
-        :param headerTuple: The ccp4 header information (excluding labels) in a tuple.
-        :type headerTuple: :py:class:`tuple`
+        :param headerRecord: The ccp4 header information (excluding labels) as a record of :data:`pdb_eda.ccp4.headerDtype`.
+        :type headerRecord: :class:`numpy.void`
         :param labels: The labels field in a ccp4 header.
         :type labels: :py:class:`bytes`
         :param endian: The endianness of the file.
         :type endian: :py:class:`str`
+        :param verbose: verbose mode, defaults to :py:obj:`False`
+        :type verbose: :py:class:`bool`
         """
-        self.ncrs = headerTuple[0:3]
+        self.ncrs = tuple(headerRecord['ncrs'].tolist())
         #Number of Columns    (fastest changing in map)
         #Number of Rows
         #Number of Sections   (slowest changing in map)
 
-        self.mode = headerTuple[3]
+        self.mode = headerRecord['mode'].item()
         self.endian = endian
         #Data type
         #    0 = envelope stored as signed bytes (from -128 lowest to 127 highest)
@@ -183,45 +212,57 @@ class DensityHeader(object):
         #    Note: Mode 2 is the normal mode used in the CCP4 programs. Other modes than 2 and 0
         #        may NOT WORK
 
-        self.crsStart = headerTuple[4:7]  # Number of first COLUMN, ROW, and SECTION in map
-        self.nintervalX = headerTuple[7]  # Number of intervals along X
-        self.nintervalY = headerTuple[8]  # Number of intervals along Y
-        self.nintervalZ = headerTuple[9]  # Number of intervals along Z
-        self.xlength = headerTuple[10]  # Cell Dimensions (Angstroms)
-        self.ylength = headerTuple[11]  # ''
-        self.zlength = headerTuple[12]  # ''
-        self.alpha = headerTuple[13]  # Cell Angles     (Degrees)
-        self.beta = headerTuple[14]  # ''
-        self.gamma = headerTuple[15]  # ''
-        self.col2xyz = headerTuple[16]  # Which axis corresponds to Cols.  (1,2,3 for X,Y,Z)
-        self.row2xyz = headerTuple[17]  # Which axis corresponds to Rows   (1,2,3 for X,Y,Z)
-        self.sec2xyz = headerTuple[18]  # Which axis corresponds to Sects. (1,2,3 for X,Y,Z)
-        self.densityMin = headerTuple[19]  # Minimum density value
-        self.densityMax = headerTuple[20]  # Maximum density value
-        self.densityMean = headerTuple[21]  # Mean    density value    (Average)
-        self.spaceGroup = headerTuple[22]  # Space group number
-        self.symmetryBytes = headerTuple[23]  # Number of bytes used for storing symmetry operators
-        self.skewFlag = headerTuple[24]  # Flag for skew transformation, =0 none, =1 if foll
-        self.skewMat = headerTuple[25:34]  # Skew matrix S (in order S11, S12, S13, S21 etc) if LSKFLG .ne. 0.
-        self.skewTrans = headerTuple[34:37]
+        self.crsStart = tuple(headerRecord['crsStart'].tolist())  # Number of first COLUMN, ROW, and SECTION in map
+        self.nintervalX = headerRecord['nintervalX'].item()  # Number of intervals along X
+        self.nintervalY = headerRecord['nintervalY'].item()  # Number of intervals along Y
+        self.nintervalZ = headerRecord['nintervalZ'].item()  # Number of intervals along Z
+        self.xlength = headerRecord['xlength'].item()  # Cell Dimensions (Angstroms)
+        self.ylength = headerRecord['ylength'].item()  # ''
+        self.zlength = headerRecord['zlength'].item()  # ''
+        self.alpha = headerRecord['alpha'].item()  # Cell Angles     (Degrees)
+        self.beta = headerRecord['beta'].item()  # ''
+        self.gamma = headerRecord['gamma'].item()  # ''
+        self.col2xyz = headerRecord['col2xyz'].item()  # Which axis corresponds to Cols.  (1,2,3 for X,Y,Z)
+        self.row2xyz = headerRecord['row2xyz'].item()  # Which axis corresponds to Rows   (1,2,3 for X,Y,Z)
+        self.sec2xyz = headerRecord['sec2xyz'].item()  # Which axis corresponds to Sects. (1,2,3 for X,Y,Z)
+        self.densityMin = headerRecord['densityMin'].item()  # Minimum density value
+        self.densityMax = headerRecord['densityMax'].item()  # Maximum density value
+        self.densityMean = headerRecord['densityMean'].item()  # Mean    density value    (Average)
+        self.spaceGroup = headerRecord['spaceGroup'].item()  # Space group number
+        self.symmetryBytes = headerRecord['symmetryBytes'].item()  # Number of bytes used for storing symmetry operators
+        self.skewFlag = headerRecord['skewFlag'].item()  # Flag for skew transformation, =0 none, =1 if foll
+        self.skewMat = headerRecord['skewMat'].astype(float).reshape(3, 3)  # Skew matrix S (in order S11, S12, S13, S21 etc) if LSKFLG .ne. 0.
+        self.skewTrans = tuple(headerRecord['skewTrans'].tolist())
         #Skew translation t if LSKFLG .ne. 0.
         #            Skew transformation is from standard orthogonal
         #            coordinate frame (as used for atoms) to orthogonal
         #            map frame, as: Xo(map) = S * (Xo(atoms) - t)
 
-        self.futureUse = headerTuple[37:49]
+        self.futureUse = tuple(headerRecord['futureUse'].tolist())
         #(some of these are used by the MSUBSX routines in MAPBRICK, MAPCONT and FRODO) (all set to zero by default)
-        self.originEM = headerTuple[49:52]
+        self.originEM = tuple(headerRecord['originEM'].tolist())
         #Use ORIGIN records rather than old crsStart records as in http://www2.mrc-lmb.cam.ac.uk/image2000.html
         #The ORIGIN field is only used by the EM community, and has undefined meaning for non-orthogonal maps and/or
         #non-cubic voxels, etc.
 
-        self.mapChar = headerTuple[52:56]  # Character string 'MAP ' to identify file type
-        self.machineStamp = headerTuple[56]  # Machine stamp indicating the machine type which wrote file
-        self.rmsd = headerTuple[57]  # Rms deviation of map from mean density
-        self.nLabel = headerTuple[58]  # Number of labels being used
+        self.mapChar = bytes(headerRecord['mapChar'])  # Character string 'MAP ' to identify file type
+        self.machineStamp = headerRecord['machineStamp'].item()  # Machine stamp indicating the machine type which wrote file
+        self.rmsd = headerRecord['rmsd'].item()  # Rms deviation of map from mean density
+        self.nLabel = headerRecord['nLabel'].item()  # Number of labels being used
         self.labels = labels
 
+        ## Fix missing intervals and mappings before anything is derived from them.
+        for axis, index in (('X', 0), ('Y', 1), ('Z', 2)):
+            if getattr(self, 'ninterval' + axis) == 0 and self.ncrs[index] > 0:
+                setattr(self, 'ninterval' + axis, self.ncrs[index] - 1)
+                if verbose: warnings.warn("Fixed number of " + axis + " interval")
+
+        if self.col2xyz == 0 and self.row2xyz == 0 and self.sec2xyz == 0:
+            self.col2xyz = 1
+            self.row2xyz = 2
+            self.sec2xyz = 3
+            if verbose: warnings.warn("Mappings from column/row/section to xyz are all 0, set to 1, 2, 3 instead.")
+
         self.mapSize = self.ncrs[0] * self.ncrs[1] * self.ncrs[2] * 4
         self.xyzLength = [self.xlength, self.ylength, self.zlength]
         self.xyzInterval = [self.nintervalX, self.nintervalY, self.nintervalZ]
@@ -240,22 +281,24 @@ class DensityHeader(object):
         alpha = np.pi / 180 * self.alpha
         beta = np.pi / 180 * self.beta
         gamma = np.pi / 180 * self.gamma
-        self.unitVolume = self.xlength * self.ylength * self.zlength / self.nintervalX / self.nintervalY / self.nintervalZ * \
-                          np.sqrt(1 - np.cos(alpha) ** 2 - np.cos(beta) ** 2 - np.cos(gamma) ** 2 + 2 * np.cos(alpha) * np.cos(beta) * np.cos(gamma))
+        cosAlpha, cosBeta, cosGamma = np.cos(alpha), np.cos(beta), np.cos(gamma)
+        sinGamma = np.sin(gamma)
 
         ## A reusable part in the cell volumn calculation
-        temp = np.sqrt(1 - np.cos(alpha) ** 2 - np.cos(beta) ** 2 - np.cos(gamma) ** 2 + 2 * np.cos(alpha) * np.cos(beta) * np.cos(gamma))
-        self.orthoMat = [[self.xlength, self.ylength * np.cos(gamma), self.zlength * np.cos(beta)],
-                         [0, self.ylength * np.sin(gamma), self.zlength * (np.cos(alpha) - np.cos(beta) * np.cos(gamma)) / np.sin(gamma)],
-                         [0, 0, self.zlength * temp / np.sin(gamma)]]
+        temp = np.sqrt(1 - cosAlpha ** 2 - cosBeta ** 2 - cosGamma ** 2 + 2 * cosAlpha * cosBeta * cosGamma)
+        self.unitVolume = float(self.xlength * self.ylength * self.zlength / self.nintervalX / self.nintervalY / self.nintervalZ * temp)
+
+        self.orthoMat = np.array([[self.xlength, self.ylength * cosGamma, self.zlength * cosBeta],
+                                  [0, self.ylength * sinGamma, self.zlength * (cosAlpha - cosBeta * cosGamma) / sinGamma],
+                                  [0, 0, self.zlength * temp / sinGamma]])
 
         self.deOrthoMat = np.linalg.inv(self.orthoMat)
         self.deOrthoMat[abs(self.deOrthoMat) < 1e-10] = 0.0
 
-        #self.deOrthoMat = [[1/self.xlength, - np.cos(gamma) / np.sin(gamma) / self.xlength,
-        #                    (np.cos(gamma) * (np.cos(alpha) - np.cos(beta) * np.cos(gamma)) / np.sin(gamma) - np.cos(beta) * np.sin(gamma)) / self.xlength / temp],
-        #                   [0, 1/np.sin(gamma)/self.ylength, - (np.cos(alpha) - np.cos(beta) * np.cos(gamma)) / np.sin(gamma) / self.ylength / temp],
-        #                   [0, 0, np.sin(gamma) / self.zlength / temp]]
+        #self.deOrthoMat = [[1/self.xlength, - cosGamma / sinGamma / self.xlength,
+        #                    (cosGamma * (cosAlpha - cosBeta * cosGamma) / sinGamma - cosBeta * sinGamma) / self.xlength / temp],
+        #                   [0, 1/sinGamma/self.ylength, - (cosAlpha - cosBeta * cosGamma) / sinGamma / self.ylength / temp],
+        #                   [0, 0, sinGamma / self.zlength / temp]]
 
         self.origin = self._calculateOrigin()
 
@@ -268,6 +311,15 @@ class DensityHeader(object):
             ncrs[2] = self.xyzInterval[self.sec2xyz - 1]
         self.uniqueNcrs = ncrs
 
+        ## Numpy versions of the values used in converting arrays of coordinates.
+        self._isOrtho = self.alpha == self.beta == self.gamma == 90
+        self._originArray = np.asarray(self.origin, dtype=np.float64)
+        self._gridLengthArray = np.asarray(self.gridLength, dtype=np.float64)
+        self._xyzIntervalArray = np.asarray(self.xyzInterval)
+        self._map2xyzArray = np.asarray(self.map2xyz)
+        self._map2crsArray = np.asarray(self.map2crs)
+        self._xyzStartArray = np.asarray(self.crsStart)[self._map2xyzArray]  # crsStart in x, y, z order
+
 
     def _calculateOrigin(self):
         """Calculate the xyz coordinates from the header information.
@@ -294,12 +346,23 @@ class DensityHeader(object):
         :return: crs coordinates.
         :rtype: A :py:class:`list` of :py:class:`int`.
         """
-        if self.alpha == self.beta == self.gamma == 90:
-            crsGridPos = [int(round((xyzCoord[i] - self.origin[i]) / self.gridLength[i])) for i in range(3)]
+        return self.xyz2crsCoordArray(np.asarray(xyzCoord, dtype=np.float64).reshape(1, 3))[0].tolist()
+
+    def xyz2crsCoordArray(self, xyzArray):
+        """Convert an array of xyz coordinates into crs coordinates.
+
+        :param xyzArray: N x 3 array of xyz coordinates.
+        :type xyzArray: :class:`numpy.array`
+
+        :return: N x 3 array of crs coordinates.
+        :rtype: :class:`numpy.array`
+        """
+        if self._isOrtho:
+            crsGridPos = np.rint((xyzArray - self._originArray) / self._gridLengthArray).astype(np.int64)
         else:
-            fraction = np.dot(self.deOrthoMat, xyzCoord)
-            crsGridPos = [int(round(fraction[i] * self.xyzInterval[i])) - self.crsStart[self.map2xyz[i]] for i in range(3)]
-        return [crsGridPos[self.map2crs[i]] for i in range(3)]
+            fractions = xyzArray @ self.deOrthoMat.T
+            crsGridPos = np.rint(fractions * self._xyzIntervalArray).astype(np.int64) - self._xyzStartArray
+        return crsGridPos[:, self._map2crsArray]
 
     def crs2xyzCoord(self, crsCoord):
         """Convert the crs coordinates into xyz coordinates.
@@ -315,6 +378,22 @@ class DensityHeader(object):
         else:
             return np.dot(self.orthoMat, [(crsCoord[self.map2xyz[i]] + self.crsStart[self.map2xyz[i]]) / self.xyzInterval[i] for i in range(3)])
 
+    def crs2xyzCoordArray(self, crsArray):
+        """Convert an array of crs coordinates into xyz coordinates.
+
+        :param crsArray: N x 3 array of crs coordinates.
+        :type crsArray: :class:`numpy.array`
+
+        :return: N x 3 array of xyz coordinates.
+        :rtype: :class:`numpy.array`
+        """
+        xyzGridPos = crsArray[:, self._map2xyzArray]
+        if self._isOrtho:
+            return xyzGridPos * self._gridLengthArray + self._originArray
+        else:
+            fractions = (xyzGridPos + self._xyzStartArray) / self._xyzIntervalArray
+            return fractions @ self.orthoMat.T
+
 
 class DensityMatrix:
     """:class:`pdb_eda.ccp4.DensityMatrix` that stores data and methods of a ccp4 file."""
@@ -326,16 +405,18 @@ class DensityMatrix:
         :type header: :class:`pdb_eda.ccp4.DensityHeader`
         :param origin: the xyz coordinates of the origin of the first number of the density data.
         :type origin: :py:class:`list`
-        :param density: the density data as a 1-d list.
-        :type density: :py:class:`tuple`
+        :param density: the density data as a 1-d array.
+        :type density: :class:`numpy.array`, :py:class:`tuple`, :py:class:`list`
         :param pdbid: PDB entry ID
         :type pdbid: :py:class:`str`
         """
         self.pdbid = pdbid
         self.header = header
         self.origin = origin
-        self.densityArray = density
-        self.density = np.array(density).reshape(header.ncrs[2], header.ncrs[1], header.ncrs[0])
+        if not isinstance(density, np.ndarray):
+            density = np.fromiter(density, dtype=np.float32, count=header.ncrs[0] * header.ncrs[1] * header.ncrs[2])
+        self.density = density.reshape(header.ncrs[2], header.ncrs[1], header.ncrs[0])
+        self.densityArray = self.density.ravel()
         self._meanDensity = None
         self._stdDensity = None
         self._totalAbsDensity = {}
@@ -347,8 +428,8 @@ class DensityMatrix:
         :return: mean
         :rtype: :py:class:`float`
         """
-        if self._meanDensity == None:
-            self._meanDensity = np.mean(self.densityArray)
+        if self._meanDensity is None:
+            self._calculateDensityStatistics()
         return self._meanDensity
 
     @property
@@ -358,10 +439,15 @@ class DensityMatrix:
         :return: std
         :rtype: :py:class:`float`
         """
-        if self._stdDensity == None:
-            self._stdDensity = np.std(self.densityArray)
+        if self._stdDensity is None:
+            self._calculateDensityStatistics()
         return self._stdDensity
 
+    def _calculateDensityStatistics(self):
+        """Calculates the mean and standard deviation of the density, accumulating in float64."""
+        self._meanDensity = float(self.densityArray.mean(dtype=np.float64))
+        self._stdDensity = float(self.densityArray.std(dtype=np.float64))
+
     def getTotalAbsDensity(self, densityCutoff):
         """Returns total absolute Density above a densityCutoff
 
@@ -431,8 +517,8 @@ class DensityMatrix:
         :return: density
         :rtype: :py:class:`float`
         """
-        crsCoordList = utils.getSphereCrsFromXyz(self, xyzCoord, radius, densityCutoff)
-        return sum(utils.getPointDensityFromCrs(self, crs) for crs in crsCoordList)
+        densities = utils.getSphereDensityArrayFromXyz(self, xyzCoord, radius, densityCutoff)[1]
+        return float(densities.sum(dtype=np.float64))
 
     def findAberrantBlobs(self, xyzCoords, radius, densityCutoff=0):
         """Within a given radius, find and aggregate all neighbouring aberrant points into blobs (red/green meshes).
@@ -452,7 +538,7 @@ class DensityMatrix:
         """
         if not isinstance(xyzCoords[0], (np.floating, float)): # test if xyzCoords is a single xyzCoord or a list of them.
             if len(xyzCoords) > 1:
-                crsCoordList = list(utils.getSphereCrsFromXyzList(self, xyzCoords, radius, densityCutoff))
+                crsCoordList = utils.getSphereCrsArrayFromXyzList(self, xyzCoords, radius, densityCutoff)
             else:
                 crsCoordList = utils.getSphereCrsFromXyz(self, xyzCoords[0], radius, densityCutoff)
         else:
@@ -476,12 +562,12 @@ class DensityMatrix:
         """Calculates a list of blobs from a given crsList.
 
         :param crsList: a crs list.
-        :type crsList: :py:class:`list`, :py:class:`set`
+        :type crsList: :py:class:`list`, :py:class:`set`, :class:`numpy.array`
 
         :return: blobList
         :rtype: :py:class:`list` of :class:`pdb_eda.ccp4.DensityBlob` objects.
         """
-        crsLists = utils.createCrsLists(crsList)
+        crsLists = createCrsLists(crsList)
         return [ DensityBlob.fromCrsList(crs_list, self) for crs_list in crsLists ]
 
 
@@ -498,7 +584,7 @@ class DensityBlob:
         :param volume: the volume of the blob = number of density units * unit volumes.
         :type volume: :py:class:`float`
         :param crsList: the crs list of the blob.
-        :type crsList: :py:class:`list`
+        :type crsList: :py:class:`list`, :py:class:`set`, :class:`numpy.array`
         :param densityMatrix: the entire density map that the blob belongs to.
         :type densityMatrix: `pdb_eda.ccp4.DensityMatrix`
         :param atoms: list of atoms for the blob.
@@ -511,38 +597,52 @@ class DensityBlob:
         self.coordCenter = coordCenter
         self.totalDensity = totalDensity
         self.volume = volume
-        self.crsList = {tuple(crs) for crs in crsList}
+        self.crsArray = np.asarray(crsList if isinstance(crsList, np.ndarray) else list(crsList), dtype=np.int32).reshape(-1, 3)
         self.densityMatrix = densityMatrix
         self.atoms = [] if not atoms else atoms
 
+        ## The set of crs tuples is only built when a membership test needs it.
+        self._crsList = None
+
+        ## Running sums kept so merging can update the centroids with only the new points.
+        self._weightedXyzSum = np.asarray(centroid, dtype=np.float64) * totalDensity
+        self._xyzSum = np.asarray(coordCenter, dtype=np.float64) * len(self.crsArray)
+
+    @property
+    def crsList(self):
+        """Returns the set of crs tuples of the blob.
+
+        :return: crsList
+        :rtype: :py:class:`set`
+        """
+        if self._crsList is None:
+            self._crsList = set(map(tuple, self.crsArray.tolist()))
+        return self._crsList
+
     @property
     def validCrs(self):
-        return utils.testValidCrsList(self.densityMatrix, self.crsList)
+        return bool(utils.testValidCrsArray(self.densityMatrix, self.crsArray).all())
 
     @staticmethod
     def fromCrsList(crsList, densityMatrix):
         """The creator of a A :class:`pdb_eda.ccp4.DensityBlob` object.
 
         :param crsList: the crs list of the blob.
-        :type crsList: :py:class:`list`
+        :type crsList: :py:class:`list`, :py:class:`set`, :class:`numpy.array`
         :param densityMatrix: the 3-d density matrix to use for calculating centroid etc, so the object does not have to have a density list data member.
         :type densityMatrix: :class:`pdb_eda.ccp4.DensityMatrix`
 
         :return: densityBlob
         :rtype: :class:`pdb_eda.ccp4.DensityBlob`
         """
-        weights = [0, 0, 0]
-        totalDensity = 0
-        for i, point in enumerate(crsList):
-            density = utils.getPointDensityFromCrs(densityMatrix, point)
-            pointXYZ = densityMatrix.header.crs2xyzCoord(point)
-            weights = [weights[i] + density * pointXYZ[i] for i in range(3)]
-            totalDensity += density
+        crsArray = np.asarray(crsList if isinstance(crsList, np.ndarray) else list(crsList), dtype=np.int32).reshape(-1, 3)
+        densities = utils.getPointDensityFromCrsArray(densityMatrix, crsArray).astype(np.float64)
+        xyzArray = densityMatrix.header.crs2xyzCoordArray(crsArray)
 
-        centroidXYZ = [weight / totalDensity for weight in weights]
-        npoints = len(crsList)
-        coordCenter = [sum(k) / npoints for k in zip(*[densityMatrix.header.crs2xyzCoord(crs) for crs in crsList])]
-        return DensityBlob(centroidXYZ, coordCenter, totalDensity, densityMatrix.header.unitVolume * len(crsList), crsList, densityMatrix)
+        totalDensity = float(densities.sum())
+        centroidXYZ = (densities @ xyzArray / totalDensity).tolist()
+        coordCenter = xyzArray.mean(axis=0).tolist()
+        return DensityBlob(centroidXYZ, coordCenter, totalDensity, densityMatrix.header.unitVolume * len(crsArray), crsArray, densityMatrix)
 
 
     def __eq__(self, otherBlob):
@@ -554,12 +654,12 @@ class DensityBlob:
         :return: bool
         :rtype: :py:class`bool`
         """
-        if abs(self.volume - otherBlob.volume) >= 1e-6: return False
-        if abs(self.totalDensity - otherBlob.totalDensity) >= 1e-6: return False
-        for i in range(0, 3):
-            if abs(self.centroid[i] - otherBlob.centroid[i]) >= 1e-6: return False
+        return math.isclose(self.volume, otherBlob.volume, rel_tol=1e-9, abs_tol=1e-6) and \
+            math.isclose(self.totalDensity, otherBlob.totalDensity, rel_tol=1e-9, abs_tol=1e-6) and \
+            bool(np.max(np.abs(np.asarray(self.centroid) - np.asarray(otherBlob.centroid))) < 1e-6)
 
-        return True
+    ## Blobs are mutable and compared with tolerances, so they are not hashable.
+    __hash__ = None
 
     def testOverlap(self, otherBlob):
         """Check if two blobs overlaps or right next to each other.
@@ -578,12 +678,23 @@ class DensityBlob:
         :param otherBlob:
         :type otherBlob: :class:`pdb_eda.ccp4.DensityBlob`
         """
-        self.crsList.update(otherBlob.crsList)
-        atoms = self.atoms + [atom for atom in otherBlob.atoms if atom not in self.atoms]
-        newBlob = DensityBlob.fromCrsList(self.crsList, self.densityMatrix)
-
-        self.__dict__.update(newBlob.__dict__)
-        self.atoms = atoms
+        crsList = self.crsList
+        newCrsList = [crs for crs in map(tuple, otherBlob.crsArray.tolist()) if crs not in crsList]
+        if newCrsList:
+            crsArray = np.asarray(newCrsList, dtype=np.int32)
+            densities = utils.getPointDensityFromCrsArray(self.densityMatrix, crsArray).astype(np.float64)
+            xyzArray = self.densityMatrix.header.crs2xyzCoordArray(crsArray)
+
+            crsList.update(newCrsList)
+            self.crsArray = np.vstack([self.crsArray, crsArray])
+            self.totalDensity += float(densities.sum())
+            self._weightedXyzSum = self._weightedXyzSum + densities @ xyzArray
+            self._xyzSum = self._xyzSum + xyzArray.sum(axis=0)
+            self.centroid = (self._weightedXyzSum / self.totalDensity).tolist()
+            self.coordCenter = (self._xyzSum / len(self.crsArray)).tolist()
+            self.volume = self.densityMatrix.header.unitVolume * len(self.crsArray)
+
+        self.atoms = self.atoms + [atom for atom in otherBlob.atoms if atom not in self.atoms]
 
     def clone(self):
         """Returns a copy of the density blob.
@@ -591,5 +702,5 @@ class DensityBlob:
         :return: densityBlob
         :rtype: :class:`pdb_eda.ccp4.DensityBlob`
         """
-        return DensityBlob(self.centroid,self.coordCenter,self.totalDensity,self.volume,self.crsList,self.densityMatrix,self.atoms.copy())
+        return DensityBlob(self.centroid,self.coordCenter,self.totalDensity,self.volume,self.crsArray.copy(),self.densityMatrix,self.atoms.copy())
 
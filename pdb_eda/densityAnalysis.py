@@ -431,7 +431,8 @@ class DensityAnalysis(object):
         """
         if self._fc is None:
             self._fc = copy.deepcopy(self.densityObj)
-            self._fc.density = self.densityObj.density - self.diffDensityObj.density * 2
+            ## The maps are stored as float32, so the difference is taken in float64.
+            self._fc.density = self.densityObj.density.astype(np.float64) - self.diffDensityObj.density * 2
         return self._fc
 
     @property
@@ -639,7 +640,7 @@ class DensityAnalysis(object):
                 residuePool = residuePool + atomClouds ## For aggregating atom clouds into residue clouds
 
                 atomList.append([residue.parent.id, residue.id[1], atom.parent.resname, atom.name, fullAtomNameMapAtomTypeGlobal[resAtom],
-                                 bestAtomCloud.totalDensity / fullAtomNameMapElectronsGlobal[resAtom] / atom.get_occupancy(), len(bestAtomCloud.crsList),
+                                 bestAtomCloud.totalDensity / fullAtomNameMapElectronsGlobal[resAtom] / atom.get_occupancy(), len(bestAtomCloud.crsArray),
                                  fullAtomNameMapElectronsGlobal[resAtom], atom.get_bfactor(), np.linalg.norm(atom.coord - bestAtomCloud.centroid), bestAtomCloud.centroid])
             ## End atom loop
 
@@ -679,7 +680,7 @@ class DensityAnalysis(object):
             for cloud in resClouds:
                 resElectrons = sum([fullAtomNameMapElectronsGlobal[residueAtomName(atom)] * atom.get_occupancy() for atom in cloud.atoms])
                 if resElectrons >= minCloudElectrons:
-                    residueList.append([residue.parent.id, residue.id[1], residue.resname, cloud.totalDensity / resElectrons, len(cloud.crsList), resElectrons, len(cloud.crsList) * densityObj.header.unitVolume,
+                    residueList.append([residue.parent.id, residue.id[1], residue.resname, cloud.totalDensity / resElectrons, len(cloud.crsArray), resElectrons, len(cloud.crsArray) * densityObj.header.unitVolume,
                                         cloud.centroid])
 
             domainPool = domainPool + resClouds ## For aggregating residue clouds into domain clouds
@@ -716,11 +717,11 @@ class DensityAnalysis(object):
             atom = cloud.atoms[0]
             domainElectrons = sum([fullAtomNameMapElectronsGlobal[residueAtomName(atom)] * atom.get_occupancy() for atom in cloud.atoms])
             totalElectrons += domainElectrons
-            numVoxels += len(cloud.crsList)
+            numVoxels += len(cloud.crsArray)
             totalDensity += cloud.totalDensity
 
             if domainElectrons >= minCloudElectrons:
-                domainList.append([atom.parent.parent.id, atom.parent.id[1], atom.parent.resname, cloud.totalDensity / domainElectrons, len(cloud.crsList), domainElectrons, len(cloud.crsList) * densityObj.header.unitVolume,
+                domainList.append([atom.parent.parent.id, atom.parent.id[1], atom.parent.resname, cloud.totalDensity / domainElectrons, len(cloud.crsArray), domainElectrons, len(cloud.crsArray) * densityObj.header.unitVolume,
                                   cloud.centroid])
 
         if totalElectrons < minTotalElectrons:
@@ -934,7 +935,7 @@ class DensityAnalysis(object):
             symmetryDistances = scipy.spatial.distance.cdist(centroid, symmetryAtomCoords)
             atom = symmetryAtoms[np.argmin(symmetryDistances[0])] # closest atom
             sign = '+' if blob.totalDensity >= 0 else '-'
-            blobStats.append([symmetryDistances.min(), sign, abs(blob.totalDensity / densityElectronRatio), len(blob.crsList), blob.volume, atom.parent.parent.id, atom.parent.id[1], atom.parent.resname, atom.name, atom.symmetry, atom.coord, blob.centroid])
+            blobStats.append([symmetryDistances.min(), sign, abs(blob.totalDensity / densityElectronRatio), len(blob.crsArray), blob.volume, atom.parent.parent.id, atom.parent.id[1], atom.parent.resname, atom.name, atom.symmetry, atom.coord, blob.centroid])
 
         return blobStats
 
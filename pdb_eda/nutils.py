@@ -0,0 +1,96 @@
+"""
+Numba Utilities (pdb_eda.nutils)
+--------------------------------
+
+Contains numba-compiled low-level functions used in pdb_eda.ccp4.
+Importing this module raises an ImportError if numba is not installed, in which case pdb_eda.cutils or pdb_eda.utils is used instead.
+"""
+import itertools
+
+import numpy as np
+import numba
+
+## offsets of the 26 neighbors in the one layer outer box around a point.
+neighborOffsets = np.array([offset for offset in itertools.product([-1, 0, 1], repeat=3) if offset != (0, 0, 0)], dtype=np.int64)
+
+
+@numba.njit(cache=True)
+def _labelComponents(crsArray, offsets):
+    """Labels the connected components of a crs array, where two points are connected if they are in each other's one layer outer box.
+
+    :param crsArray: N x 3 array of crs coordinates.
+    :type crsArray: :class:`numpy.array`
+    :param offsets: M x 3 array of neighbor offsets.
+    :type offsets: :class:`numpy.array`
+
+    :return: labels, the component index of each crs coordinate, and the number of components.
+    :rtype: :py:class:`tuple`
+    """
+    numPoints = crsArray.shape[0]
+    labels = np.full(numPoints, -1, np.int32)
+    if numPoints == 0:
+        return labels, 0
+
+    ## a flat grid over the bounding box of the points, holding the index of the point in each voxel or -1.
+    minCrs = crsArray[0].copy()
+    maxCrs = crsArray[0].copy()
+    for i in range(numPoints):
+        for axis in range(3):
+            minCrs[axis] = min(minCrs[axis], crsArray[i, axis])
+            maxCrs[axis] = max(maxCrs[axis], crsArray[i, axis])
+    dims = maxCrs - minCrs + 1
+    grid = np.full(dims[0] * dims[1] * dims[2], -1, np.int32)
+    cells = np.empty(numPoints, np.int64)
+    for i in range(numPoints):
+        cells[i] = ((crsArray[i, 2] - minCrs[2]) * dims[1] + crsArray[i, 1] - minCrs[1]) * dims[0] + crsArray[i, 0] - minCrs[0]
+        if grid[cells[i]] < 0:
+            grid[cells[i]] = i
+
+    stack = np.empty(numPoints, np.int32)
+    numComponents = 0
+    for start in range(numPoints):
+        seed = grid[cells[start]]
+        if labels[seed] >= 0:
+            continue
+
+        labels[seed] = numComponents
+        stack[0] = seed
+        top = 1
+        while top > 0:
+            top -= 1
+            point = stack[top]
+            for k in range(offsets.shape[0]):
+                c = crsArray[point, 0] - minCrs[0] + offsets[k, 0]
+                r = crsArray[point, 1] - minCrs[1] + offsets[k, 1]
+                s = crsArray[point, 2] - minCrs[2] + offsets[k, 2]
+                if c < 0 or c >= dims[0] or r < 0 or r >= dims[1] or s < 0 or s >= dims[2]:
+                    continue
+                neighbor = grid[(s * dims[1] + r) * dims[0] + c]
+                if neighbor >= 0 and labels[neighbor] < 0:
+                    labels[neighbor] = numComponents
+                    stack[top] = neighbor
+                    top += 1
+        numComponents += 1
+
+    ## duplicated points share the label of the point stored in their voxel.
+    for i in range(numPoints):
+        labels[i] = labels[grid[cells[i]]]
+    return labels, numComponents
+
+
+def createCrsLists(crsList):
+    """Calculates a list of crsLists from a given crsList.
+    This is a preparation step for creating blobs.
+
+    :param crsList: a crs list.
+    :type crsList: :py:class:`list`, :py:class:`set`, :class:`numpy.array`
+
+    :return: crsLists is a list of disjoint crsLists.
+    :rtype: :py:class:`list`
+    """
+    crsArray = np.asarray(crsList if isinstance(crsList, np.ndarray) else list(crsList), dtype=np.int64).reshape(-1, 3)
+    labels, numComponents = _labelComponents(crsArray, neighborOffsets)
+
+    order = np.argsort(labels, kind='stable')
+    bounds = np.searchsorted(labels[order], np.arange(numComponents + 1))
+    return [[tuple(crs) for crs in crsArray[order[bounds[i]:bounds[i + 1]]].tolist()] for i in range(numComponents)]
@@ -17,10 +17,10 @@ def testOverlap(selfBlob, otherBlob):
     :return: bool
     :rtype: :py:class:`bool`
     """
-    if len(selfBlob.crsList) > len(otherBlob.crsList):
-        return True if any(-1 <= x[0] - y[0] <= 1 and -1 <= x[1] - y[1] <= 1 and -1 <= x[2] - y[2] <= 1 for x in selfBlob.crsList for y in otherBlob.crsList) else False
-    else:
-        return True if any(-1 <= x[0] - y[0] <= 1 and -1 <= x[1] - y[1] <= 1 and -1 <= x[2] - y[2] <= 1 for x in otherBlob.crsList for y in selfBlob.crsList) else False
+    ## expand the smaller blob by one voxel in every direction and look its neighborhood up in the bigger blob.
+    smallBlob, bigBlob = (selfBlob, otherBlob) if len(selfBlob.crsArray) <= len(otherBlob.crsArray) else (otherBlob, selfBlob)
+    neighbors = {(x + dx, y + dy, z + dz) for x, y, z in smallBlob.crsList for dx in (-1, 0, 1) for dy in (-1, 0, 1) for dz in (-1, 0, 1)}
+    return not neighbors.isdisjoint(bigBlob.crsList)
 
 
 def sumOfAbs(array, cutoff):
@@ -34,7 +34,8 @@ def sumOfAbs(array, cutoff):
     :return: value
     :rtype: :py:class:`float`
     """
-    return sum(abs(value) for value in array if abs(value) > cutoff)
+    absArray = np.abs(np.asarray(array, dtype=np.float64))
+    return float(absArray[absArray > cutoff].sum())
 
 import numpy as np
 import scipy.spatial
@@ -135,12 +136,60 @@ def getPointDensityFromCrs(densityMatrix, crsCoord):
     header = densityMatrix.header
     for ind in range(3):
         if crsCoord[ind] < 0 or crsCoord[ind] >= header.ncrs[ind]:
-            crsCoord[ind] -= int(np.floor(crsCoord[ind] / header.crsInterval[ind]) * header.crsInterval[ind])
+            crsCoord[ind] -= crsCoord[ind] // header.crsInterval[ind] * header.crsInterval[ind]
 
         if (header.ncrs[ind] <= crsCoord[ind] < header.crsInterval[ind]) or crsCoord[ind] < 0:
             return 0
 
-    return densityMatrix.density[crsCoord[2], crsCoord[1], crsCoord[0]]
+    return float(densityMatrix.density[crsCoord[2], crsCoord[1], crsCoord[0]])
+
+def _wrapCrsArray(densityMatrix, crsArray):
+    """Brings crs coordinates outside of the density map back by their crs intervals, and tests whether they are then valid.
+
+    :param densityMatrix:
+    :type densityMatrix: :class:`pdb_eda.ccp4.DensityMatrix`
+    :param crsArray: N x 3 array of crs coordinates.
+    :type crsArray: :class:`numpy.array`
+
+    :return: the wrapped crsArray and a boolean array of whether each crs coordinate is valid.
+    :rtype: :py:class:`tuple`
+    """
+    header = densityMatrix.header
+    ncrs = np.asarray(header.ncrs)
+    crsInterval = np.asarray(header.crsInterval)
+    outside = (crsArray < 0) | (crsArray >= ncrs)
+    crsArray = np.where(outside, crsArray - crsArray // crsInterval * crsInterval, crsArray)
+    valid = np.logical_and.reduce(~(((ncrs <= crsArray) & (crsArray < crsInterval)) | (crsArray < 0)), axis=1)
+    return crsArray, valid
+
+def testValidCrsArray(densityMatrix, crsArray):
+    """Tests whether each crs coordinate in the array is valid.
+
+    :param densityMatrix:
+    :type densityMatrix: :class:`pdb_eda.ccp4.DensityMatrix`
+    :param crsArray: N x 3 array of crs coordinates.
+    :type crsArray: :class:`numpy.array`
+
+    :return: boolean array
+    :rtype: :class:`numpy.array`
+    """
+    return _wrapCrsArray(densityMatrix, crsArray)[1]
+
+def getPointDensityFromCrsArray(densityMatrix, crsArray):
+    """Returns the densities of an array of points.
+
+    :param densityMatrix:
+    :type densityMatrix: :class:`pdb_eda.ccp4.DensityMatrix`
+    :param crsArray: N x 3 array of crs coordinates.
+    :type crsArray: :class:`numpy.array`
+
+    :return: densities, 0 for points outside of the density map.
+    :rtype: :class:`numpy.array`
+    """
+    crsArray, valid = _wrapCrsArray(densityMatrix, crsArray)
+    densities = np.zeros(len(crsArray), dtype=densityMatrix.density.dtype)
+    densities[valid] = densityMatrix.density[crsArray[valid, 2], crsArray[valid, 1], crsArray[valid, 0]]
+    return densities
 
 def testValidCrs(densityMatrix, crsCoord):
     """Tests whether the crs coordinate is valid.
@@ -157,7 +206,7 @@ def testValidCrs(densityMatrix, crsCoord):
     header = densityMatrix.header
     for ind in range(3):
         if crsCoord[ind] < 0 or crsCoord[ind] >= header.ncrs[ind]:
-            crsCoord[ind] -= int(np.floor(crsCoord[ind] / header.crsInterval[ind]) * header.crsInterval[ind])
+            crsCoord[ind] -= crsCoord[ind] // header.crsInterval[ind] * header.crsInterval[ind]
 
         if (header.ncrs[ind] <= crsCoord[ind] < header.crsInterval[ind]) or crsCoord[ind] < 0:
             return False
@@ -175,7 +224,7 @@ def testValidCrsList(densityMatrix, crsList):
     :return: bool
     :rtype: :py:class:`bool`
     """
-    return not any(not testValidCrs(densityMatrix,crs) for crs in crsList)
+    return bool(testValidCrsArray(densityMatrix, np.asarray(list(crsList), dtype=np.int64).reshape(-1, 3)).all())
 
 def createFullCrsList(densityMatrix, cutoff):
     """Returns full crs list for the density matrix.
@@ -212,6 +261,63 @@ def _testXyzWithinDistance(xyzCoord1, xyzCoord2, distance):
     """
     return np.sqrt((xyzCoord2[0] - xyzCoord1[0])**2 + (xyzCoord2[1] - xyzCoord1[1])**2 + (xyzCoord2[2] - xyzCoord1[2])**2) <= distance
 
+def getSphereCrsArrayFromXyz(densityMatrix, xyzCoord, radius, densityCutoff=0):
+    """Calculates an array of crs coordinates that within a given distance of a xyz point.
+
+    :param densityMatrix:
+    :type densityMatrix: :class:`pdb_eda.ccp4.DensityMatrix`
+    :param xyzCoord: xyz coordinates.
+    :type xyzCoord: :py:class:`list`
+    :param radius:
+    :type radius: :py:class:`float`
+    :param densityCutoff: a density cutoff for all the points wants to be included, defaults to 0
+            Default 0 means include every point within the radius.
+            If cutoff < 0, include only points with density < cutoff.
+            If cutoff > 0, include only points with density > cutoff.
+    :type densityCutoff: :py:class:`float`
+
+    :return: crsArray, N x 3 array of crs coordinates
+    :rtype: :class:`numpy.array`
+    """
+    if densityCutoff != 0:
+        return getSphereDensityArrayFromXyz(densityMatrix, xyzCoord, radius, densityCutoff)[0]
+
+    header = densityMatrix.header
+    crsCoord, crsRadius = header.xyz2crsCoordArray(np.asarray([xyzCoord, np.asarray(densityMatrix.origin) + radius], dtype=np.float64))
+    crsRanges = [np.arange(crsCoord[i] - crsRadius[i] - 1, crsCoord[i] + crsRadius[i] + 2) for i in range(3)]
+    crsArray = np.stack(np.meshgrid(*crsRanges, indexing='ij'), axis=-1).reshape(-1, 3)
+
+    diffs = header.crs2xyzCoordArray(crsArray) - np.asarray(xyzCoord)
+    mask = np.einsum('ij,ij->i', diffs, diffs) <= radius ** 2
+    return crsArray[mask]
+
+def getSphereDensityArrayFromXyz(densityMatrix, xyzCoord, radius, densityCutoff=0):
+    """Calculates an array of crs coordinates that within a given distance of a xyz point, together with their densities.
+
+    :param densityMatrix:
+    :type densityMatrix: :class:`pdb_eda.ccp4.DensityMatrix`
+    :param xyzCoord: xyz coordinates.
+    :type xyzCoord: :py:class:`list`
+    :param radius:
+    :type radius: :py:class:`float`
+    :param densityCutoff: a density cutoff for all the points wants to be included, defaults to 0
+            Default 0 means include every point within the radius.
+            If cutoff < 0, include only points with density < cutoff.
+            If cutoff > 0, include only points with density > cutoff.
+    :type densityCutoff: :py:class:`float`
+
+    :return: crsArray, N x 3 array of crs coordinates, and densities, array of the N densities.
+    :rtype: :py:class:`tuple`
+    """
+    crsArray = getSphereCrsArrayFromXyz(densityMatrix, xyzCoord, radius)
+    densities = getPointDensityFromCrsArray(densityMatrix, crsArray)
+
+    if densityCutoff != 0:
+        mask = (densities > densityCutoff) if densityCutoff > 0 else (densities < densityCutoff)
+        crsArray, densities = crsArray[mask], densities[mask]
+
+    return crsArray, densities
+
 def getSphereCrsFromXyz(densityMatrix, xyzCoord, radius, densityCutoff=0):
     """Calculate a list of crs coordinates that within a given distance of a xyz point.
 
@@ -230,17 +336,40 @@ def getSphereCrsFromXyz(densityMatrix, xyzCoord, radius, densityCutoff=0):
     :return: crsCoordList of crs coordinates
     :rtype: :py:class:`list`
     """
-    crsCoord = densityMatrix.header.xyz2crsCoord(xyzCoord)
-    crsRadius = densityMatrix.header.xyz2crsCoord(densityMatrix.origin + [radius, radius, radius])
-    crsCoordList = []
-    for crs in itertools.product(range(crsCoord[0] - crsRadius[0]-1, crsCoord[0] + crsRadius[0]+1),
-                                 range(crsCoord[1] - crsRadius[1]-1, crsCoord[1] + crsRadius[1]+1),
-                                 range(crsCoord[2] - crsRadius[2]-1, crsCoord[2] + crsRadius[2]+1)):
-        density = getPointDensityFromCrs(densityMatrix,crs)
-        if ((0 < densityCutoff < density) or (density < densityCutoff < 0) or densityCutoff == 0) and _testXyzWithinDistance(xyzCoord,densityMatrix.header.crs2xyzCoord(crs),radius):
-            crsCoordList.append(crs)
+    return [tuple(crs) for crs in getSphereCrsArrayFromXyz(densityMatrix, xyzCoord, radius, densityCutoff).tolist()]
 
-    return crsCoordList
+def getSphereCrsArrayFromXyzList(densityMatrix, xyzCoordList, radius, densityCutoff=0):
+    """Calculates an array of unique crs coordinates that within a given distance from a list of xyz points.
+
+    :param densityMatrix:
+    :type densityMatrix: :class:`pdb_eda.ccp4.DensityMatrix`
+    :param xyzCoordList: xyz coordinates.
+    :type xyzCoordList: :py:class:`list`
+    :param radius: search radius or list of search radii
+    :type radius: :py:class:`float` or :py:class:`list`
+    :param densityCutoff: a density cutoff for all the points wants to be included., defaults to 0
+            Default 0 means include every point within the radius.
+            If cutoff < 0, include only points with density < cutoff.
+            If cutoff > 0, include only points with density > cutoff.
+    :type densityCutoff: :py:class:`float`
+
+    :return: crsArray, N x 3 array of unique crs coordinates
+    :rtype: :class:`numpy.array`
+    """
+    radii = radius if isinstance(radius, list) else [radius] * len(xyzCoordList)
+    crsArray = np.concatenate([np.empty((0, 3), dtype=np.int64)] +
+                              [getSphereCrsArrayFromXyz(densityMatrix, xyzCoord, testRadius, densityCutoff) for xyzCoord, testRadius in zip(xyzCoordList, radii)])
+    if len(crsArray) == 0:
+        return crsArray
+
+    ## pack each crs coordinate into a single integer within the bounding box, so duplicates can be removed by np.unique.
+    minCrs = crsArray.min(axis=0)
+    dims = crsArray.max(axis=0) - minCrs + 1
+    crsArray = crsArray - minCrs
+    ids = np.unique((crsArray[:, 2] * dims[1] + crsArray[:, 1]) * dims[0] + crsArray[:, 0])
+    ids, c = np.divmod(ids, dims[0])
+    s, r = np.divmod(ids, dims[1])
+    return np.column_stack((c, r, s)) + minCrs
 
 def getSphereCrsFromXyzList(densityMatrix, xyzCoordList, radius, densityCutoff=0):
     """Calculates a list of crs coordinates that within a given distance from a list of xyz points.
@@ -260,10 +389,7 @@ def getSphereCrsFromXyzList(densityMatrix, xyzCoordList, radius, densityCutoff=0
     :return: crsCoordList of crs coordinates
     :rtype: :py:class:`set`
     """
-    if isinstance(radius, list):
-        return {tuple(crsCoord) for xyzCoord,testRadius in zip(xyzCoordList,radius) for crsCoord in getSphereCrsFromXyz(densityMatrix, xyzCoord, testRadius, densityCutoff)}
-    else:
-        return {tuple(crsCoord) for xyzCoord in xyzCoordList for crsCoord in getSphereCrsFromXyz(densityMatrix, xyzCoord, radius, densityCutoff)}
+    return {tuple(crsCoord) for crsCoord in getSphereCrsArrayFromXyzList(densityMatrix, xyzCoordList, radius, densityCutoff).tolist()}
 
 def testValidXyz(densityMatrix, xyzCoord, radius):
     """Tests whether all crs coordinates within a given distance of a xyzCoord is within the densityMatrix.
@@ -279,7 +405,7 @@ def testValidXyz(densityMatrix, xyzCoord, radius):
     :rtype: :py:class:`bool`
     """
     crsCoord = densityMatrix.header.xyz2crsCoord(xyzCoord)
-    crsRadius = densityMatrix.header.xyz2crsCoord(densityMatrix.origin + [radius, radius, radius])
+    crsRadius = densityMatrix.header.xyz2crsCoord(np.asarray(densityMatrix.origin) + radius)
     return not any(not testValidCrs(densityMatrix, crs)
                    for crs in itertools.product(range(crsCoord[0] - crsRadius[0]-1, crsCoord[0] + crsRadius[0]+1),
                                                 range(crsCoord[1] - crsRadius[1]-1, crsCoord[1] + crsRadius[1]+1),
@@ -1,5 +1,9 @@
 from pdb_eda import ccp4
+from pdb_eda import utils
+import io
+import struct
 import numpy as np
+import pytest
 from pytest import approx
 
 pdbid = '1cbs_diff'  # Fo - Fc
@@ -8,6 +12,14 @@ posGreen = [6.1, 21.3, 20.7]  # green, big positive
 posRed = [34.3, 25.3, 22.8]  # red, big negative
 
 
+def packMap(endian, ncrs=(4, 5, 6), crsStart=(-2, 3, 1), xyzInterval=(8, 10, 12), angles=(80.0, 95.0, 105.0), axes=(3, 1, 2), symmetryBytes=80):
+    """Packs a small ccp4 map, so the parser can be tested without downloading a map."""
+    density = np.arange(ncrs[0] * ncrs[1] * ncrs[2], dtype=np.float32) / 7 - 3
+    header = struct.pack(endian + '10i6f3i3f3i27f4sifi', *ncrs, 2, *crsStart, *xyzInterval, 20.0, 25.0, 30.0, *angles, *axes,
+                         density.min(), density.max(), density.mean(), 1, symmetryBytes, 0, *([0.0] * 27), b'MAP ', 0x4144, density.std(), 1)
+    return header + b'label'.ljust(800, b' ') + b'S' * symmetryBytes + density.astype(endian + 'f4').tobytes(), density
+
+
 def test_working():
     assert 1 + 2 == 3.0
     assert [1, 2, 3] == [1, 2, 3]
@@ -59,6 +71,77 @@ def test_xyz_crs_conversion():
     assert posGreen == approx(densityObj.header.crs2xyzCoord(densityObj.header.xyz2crsCoord(posGreen)), abs=np.max(densityObj.header.gridLength)/2) # [39, 20, 38]
 
 
+def test_crs2xyz_array_conversion():
+    """Test that converting an array of crs coordinates gives the same xyz coordinates as converting them one by one."""
+    crsList = [[60, 60, 60], [80, 60, 60], [60, 160, 60], [-5, 3, 200]]
+    xyzArray = densityObj.header.crs2xyzCoordArray(np.asarray(crsList))
+    for crs, xyz in zip(crsList, xyzArray):
+        assert list(xyz) == approx(list(densityObj.header.crs2xyzCoord(crs)))
+
+
+def test_big_endian_map():
+    """Test that a big-endian map with symmetry records is parsed the same as the little-endian map."""
+    littleBuffer, density = packMap('<')
+    bigBuffer, _ = packMap('>')
+    littleObj = ccp4.parseBuffer(littleBuffer, 'little')
+    bigObj = ccp4.parseBuffer(bigBuffer, 'big')
+
+    assert littleObj.header.endian == '<'
+    assert bigObj.header.endian == '>'
+    assert bigObj.header.ncrs == littleObj.header.ncrs == (4, 5, 6)
+    assert bigObj.header.crsStart == littleObj.header.crsStart == (-2, 3, 1)
+    assert bigObj.header.map2crs == littleObj.header.map2crs == [2, 0, 1]
+    assert bigObj.header.symmetry == littleObj.header.symmetry == b'S' * 80
+    assert list(bigObj.origin) == approx(list(littleObj.origin))
+    assert np.array_equal(bigObj.density, littleObj.density)
+    assert np.array_equal(littleObj.densityArray, density)
+
+
+def test_header_fixups():
+    """Test that missing intervals and column/row/section mappings are fixed before the derived header values are calculated."""
+    buffer, _ = packMap('<', xyzInterval=(0, 0, 0), axes=(0, 0, 0))
+    with pytest.warns(UserWarning) as records:
+        fixedObj = ccp4.parseBuffer(buffer, 'fixed', verbose=True)
+
+    messages = [str(record.message) for record in records]
+    assert [message for message in messages if message.startswith("Fixed number of")] == ["Fixed number of X interval", "Fixed number of Y interval", "Fixed number of Z interval"]
+    assert any(message.startswith("Mappings from column/row/section to xyz are all 0") for message in messages)
+    assert fixedObj.header.xyzInterval == [ncrs - 1 for ncrs in fixedObj.header.ncrs]
+    assert fixedObj.header.map2crs == [0, 1, 2]
+    assert fixedObj.header.map2xyz == [0, 1, 2]
+    assert fixedObj.header.crsInterval == [3, 4, 5]
+
+
+def test_read_file_matches_stream(tmp_path, monkeypatch):
+    """Test that a memory-mapped map file is parsed the same as a stream of the same bytes, and gives a writable density matrix."""
+    buffer, density = packMap('>')
+    ccp4Filename = tmp_path / 'test.ccp4'
+    ccp4Filename.write_bytes(buffer)
+
+    mmapCalls = []
+    mmapFunction = ccp4.mmap.mmap
+    def recordMmap(*args, **kwargs):
+        mmapCalls.append(args)
+        return mmapFunction(*args, **kwargs)
+    monkeypatch.setattr(ccp4.mmap, 'mmap', recordMmap)
+    fileObj = ccp4.read(str(ccp4Filename), 'file')
+    streamObj = ccp4.parse(io.BytesIO(buffer), 'stream')
+
+    assert len(mmapCalls) == 1
+    assert np.array_equal(fileObj.density, streamObj.density)
+    assert np.array_equal(fileObj.densityArray, density)
+    assert fileObj.header.ncrs == streamObj.header.ncrs
+    assert fileObj.header.crsStart == streamObj.header.crsStart
+    assert fileObj.header.map2crs == streamObj.header.map2crs
+    assert fileObj.header.symmetry == streamObj.header.symmetry
+    assert list(fileObj.origin) == approx(list(streamObj.origin))
+
+    for testObj in (fileObj, streamObj):
+        assert testObj.density.flags.writeable
+        testObj.density[0, 0, 0] = 1.0
+        assert testObj.getPointDensityFromCrs([0, 0, 0]) == 1.0
+
+
 def test_aberrant_point():
     """Test red and green are both beyond 3 standard deviations of overall all density"""
     assert densityObj.getPointDensityFromXyz(posRed) < - 3 * densityObj.header.rmsd
@@ -72,6 +155,25 @@ def test_crs_edge_cases():
     assert densityObj.getPointDensityFromCrs([78, 77, 30]) == 0  # If a crs coordinate was not provided in the data, set it to 0
 
 
+def test_crs_array_matches_crs():
+    """Test that the array versions of the crs density lookup and validity test wrap coordinates the same way as the single point versions."""
+    ncrs = densityObj.header.ncrs
+    crsInterval = densityObj.header.crsInterval
+    crsList = [[8, 1, 30], [8, 77, 30], [88, 77, 30], [78, 77, 30],  # the edge cases above
+               [0, 0, 0], [ncrs[0] - 1, ncrs[1] - 1, ncrs[2] - 1], [-crsInterval[0], crsInterval[1] + 1, 2 * crsInterval[2]],
+               [-1, -1, -1], [-5, 3, -200], [-crsInterval[0] - 1, 2, 3],
+               [ncrs[0], 0, 0], [0, ncrs[1], 0], [0, 0, ncrs[2]], [crsInterval[0] - 1, crsInterval[1] - 1, crsInterval[2] - 1],
+               [2 * crsInterval[0] + 1, 3 * crsInterval[1] - 2, -2 * crsInterval[2]]]
+    crsArray = np.asarray(crsList)
+
+    for utilsModule in (utils, ccp4.utils):  # ccp4.utils is pdb_eda.cutils when it is compiled
+        densities = utilsModule.getPointDensityFromCrsArray(densityObj, crsArray)
+        valid = utilsModule.testValidCrsArray(densityObj, crsArray)
+        assert list(densities) == [utilsModule.getPointDensityFromCrs(densityObj, crs) for crs in crsList]
+        assert list(valid) == [utilsModule.testValidCrs(densityObj, crs) for crs in crsList]
+        assert not valid.all() and valid.any()
+
+
 def test_aberrant_blob():
     """Test the findAberrantBlobs funtion"""
     densityObj.density[:20, :20, :20] = 0
@@ -130,7 +232,69 @@ def test_merge_blob():
     assert calc1[0].testOverlap(calc2[0])
     assert calc1[0] == trueMerge
 
-"""
+
+
+def test_merge_blob_matches_union():
+    """Test that merging blobs gives the same blob as creating one from the union of their crs coordinates."""
+    crsList1 = [(c, r, s) for c in range(-2, 2) for r in range(3) for s in range(2)]
+    crsList2 = [(c, r, s) for c in range(0, 4) for r in range(1, 4) for s in range(-1, 2)]  # overlaps crsList1
+    crsList3 = [(10, 10, 10), (11, 10, 10)]  # disjoint from both
+
+    blob1 = ccp4.DensityBlob.fromCrsList(crsList1, densityObj)
+    blob2 = ccp4.DensityBlob.fromCrsList(crsList2, densityObj)
+    blob3 = ccp4.DensityBlob.fromCrsList(crsList3, densityObj)
+
+    for otherBlobs, crsUnion in (([blob2], set(crsList1) | set(crsList2)),
+                                 ([blob3], set(crsList1) | set(crsList3)),
+                                 ([blob2, blob3, blob2], set(crsList1) | set(crsList2) | set(crsList3))):
+        calcMerge = blob1.clone()
+        for otherBlob in otherBlobs:
+            calcMerge.merge(otherBlob)
+        trueMerge = ccp4.DensityBlob.fromCrsList(crsUnion, densityObj)
+
+        assert calcMerge.centroid == approx(trueMerge.centroid)
+        assert calcMerge.coordCenter == approx(trueMerge.coordCenter)
+        assert calcMerge.totalDensity == approx(trueMerge.totalDensity)
+        assert calcMerge.volume == approx(trueMerge.volume)
+
+    assert blob1.volume == approx(densityObj.header.unitVolume * len(crsList1))  # merging a clone leaves the original unchanged
+    assert not np.shares_memory(blob1.clone().crsArray, blob1.crsArray)
+
+
+def test_sphere_crs_array_from_xyz_list():
+    """Test that the union of overlapping spheres, including negative crs coordinates, matches the union of the individual spheres."""
+    xyzCoordList = [densityObj.header.crs2xyzCoord(crs) for crs in ([-4, -3, -5], [-3, -3, -4], [-1, -2, -4], [2, 1, 0])]
+    radii = [2.0, 1.5, 2.5, 1.0]
+
+    for radius, densityCutoff in ((2.0, 0), (radii, 0), (2.0, -1 * densityObj.header.rmsd), (radii, densityObj.header.rmsd)):
+        testRadii = radius if isinstance(radius, list) else [radius] * len(xyzCoordList)
+        trueUnion = set()
+        for xyzCoord, testRadius in zip(xyzCoordList, testRadii):
+            trueUnion.update(utils.getSphereCrsFromXyz(densityObj, xyzCoord, testRadius, densityCutoff))
+
+        for utilsModule in (utils, ccp4.utils):  # ccp4.utils is pdb_eda.cutils when it is compiled
+            calcUnion = utilsModule.getSphereCrsArrayFromXyzList(densityObj, xyzCoordList, radius, densityCutoff)
+            assert sorted(map(tuple, calcUnion.tolist())) == sorted(trueUnion)
+
+def test_numba_create_crs_lists():
+    """Test that the numba flood fill partitions crs coordinates into the same clusters as the pure python version."""
+    nutils = pytest.importorskip('pdb_eda.nutils')
+    rng = np.random.default_rng(0)
+    cloud = [tuple(crs) for crs in rng.integers(-8, 8, size=(300, 3)).tolist()]
+
+    testCases = [
+        cloud,
+        cloud + cloud[:50],  # duplicated points
+        [(-100, 3, -7), (-99, 4, -6), (-97, 4, -6), (250, -300, 12)],  # negative and unwrapped coordinates
+        [(-3, 7, -12)],  # single point
+        [],  # empty input
+    ]
+    for crsList in testCases:
+        numbaPartition = sorted(sorted(crsCluster) for crsCluster in nutils.createCrsLists(crsList))
+        pythonPartition = sorted(sorted(crsCluster) for crsCluster in utils.createCrsLists(crsList))
+        assert numbaPartition == pythonPartition
+
+'''
 def test_aberrant():
     """Non-orthogonal electron density map"""
     id1 = '2IM3'  # 2Fo - Fc
@@ -141,4 +305,4 @@ def test_aberrant():
     obj1 = ccp4.readFromPDBID(id1)
 
     assert obj1.getPointDensityFromXyz(metal) == approx(0.44502562284469604)
-"""
+'''